@@ -1,4 +1,8 @@
-from tokens import t
+from token_kinds import (
+    INT, FLOAT, PLUS, MINUS, MUL, DIV, POW, EE, NE, LT, GT, LTE, GTE, EQ, L_PAREN,
+    R_PAREN, LITERAL, IDENTIFIER, KW, COLON, COMMA, NEWLINE, EOF,
+)
+from tokens import TokenStream
 
 from utils import InvalidSyntaxError
 
@@ -7,9 +11,25 @@ from utils import InvalidSyntaxError
 from tokens import Token
 
 
+# operators of the binary-operation rules, as masks of token types for bin_oper's & tests
+no_operators = 0
+comp_operators = EE | NE | LT | GT | LTE | GTE
+arith_operators = PLUS | MINUS
+term_operators = MUL | DIV
+power_operators = POW
+
+# KW values that continue a chain
+no_keywords = frozenset()
+logic_keywords = frozenset(('and', 'or'))
+
+# token types that other rules branch on
+number_types = INT | FLOAT
+unary_operators = PLUS | MINUS
+end_types = EOF | NEWLINE
+
+
 class Node:
-    pos_start = None
-    pos_end = None
+    __slots__ = ('pos_start', 'pos_end')
     
     def set_pos(self, pos_start, pos_end):
         self.pos_start = pos_start
@@ -18,6 +38,8 @@ class Node:
 
 
 class NumberNode(Node):
+    __slots__ = ('tok',)
+    
     def __init__(self, tok):
         self.tok = tok
         
@@ -29,6 +51,8 @@ class NumberNode(Node):
 
 
 class LiteralNode(Node):
+    __slots__ = ('tok',)
+    
     def __init__(self, tok):
         self.tok = tok
         
@@ -40,6 +64,8 @@ class LiteralNode(Node):
 
 
 class BinOpNode(Node):
+    __slots__ = ('left', 'oper', 'right')
+    
     def __init__(self, left, oper, right):
         self.left = left
         self.oper = oper
@@ -53,6 +79,8 @@ class BinOpNode(Node):
 
 
 class UnaryOpNode(Node):
+    __slots__ = ('oper', 'node')
+    
     def __init__(self, oper, node):
         self.oper = oper
         self.node = node
@@ -65,6 +93,8 @@ class UnaryOpNode(Node):
 
 
 class VarAccessNode(Node):
+    __slots__ = ('var_name',)
+    
     def __init__(self, var_name):
         self.var_name = var_name
         
@@ -76,6 +106,8 @@ class VarAccessNode(Node):
 
 
 class VarAssignNode(Node):
+    __slots__ = ('var_name', 'value')
+    
     def __init__(self, var_name, value):
         self.var_name = var_name
         self.value = value
@@ -88,366 +120,284 @@ class VarAssignNode(Node):
 
 
 class IfBlockNode(Node):
+    __slots__ = ('case', 'else_expr')
+    
     def __init__(self, case: tuple, else_expr):
         self.case = case
         self.else_expr = else_expr
         
         self.pos_start = case[0].pos_start
+        self.pos_end = else_expr.pos_end
     
     def __repr__(self):
         return f'(if {self.case[0]} then {self.case[1]} else {self.else_expr})'
 
 
 class FuncDefNode(Node):
+    __slots__ = ('name', 'parameters', 'body')
+    
     def __init__(self, name: str, parameters: list[Token], body: Node):
         self.name = name or '[lambda]'
         self.parameters = parameters
         self.body = body
+        
+        self.pos_start = None
+        self.pos_end = None
 
 
 class FuncCallNode(Node):
+    __slots__ = ('node_to_call', 'arguments')
+    
     def __init__(self, node_to_call: Node, arguments: list[Node]):
         self.node_to_call = node_to_call
         self.arguments = arguments
+        
+        self.pos_start = None
+        self.pos_end = None
 
 
-class ParseResult:
-    def __init__(self):
-        self.error = None
-        self.node = None
-        self.advancements = 0
-    
-    def register_adv(self):
-        self.advancements += 1
-        pass
-    
-    def register(self, res) -> Node:
-        self.advancements += res.advancements
-        if res.error: self.error = res.error
-        return res.node
-    
-    def success(self, node):
-        self.node = node
-        return self
-    
-    def failure(self, error):
-        if error is not None or self.advancements == 0:
-            self.error = error
-        return self
+class ParseError(Exception):
+    """Raised by the Parser rules to abandon the parse, carries the InvalidSyntaxError"""
+    def __init__(self, error: InvalidSyntaxError):
+        super().__init__(error.info)
+        self.error = error
 
 
 class Parser:
+    """
+    Predictive recursive-descent parser: every rule picks its branch from the
+    current token alone and never backtracks, so each token is consumed once
+    and parsing is linear in the number of tokens.
+    """
     def __init__(self, tokens):
-        self.tokens = tokens
-        self.cur_index = -1
-        self.cur_tok: Token = None
-        self.advance()  # self.cur_tok will be set up in this call
+        if not isinstance(tokens, TokenStream):
+            tokens = TokenStream(tokens)
+        self.tokens = tokens.tokens
+        self.types = tokens.types
+        self.values = tokens.values
+        self.n_tokens = len(tokens)
+        self.cur_index = 0
+        self.cur_type = self.types[0]
+    
+    @property
+    def cur_tok(self) -> Token:
+        return self.tokens[self.cur_index]
     
     def advance(self):
+        # no bounds check: the tokens end with EOF, and no rule advances past it
         self.cur_index += 1
-        if self.cur_index < len(self.tokens):
-            self.cur_tok: Token = self.tokens[self.cur_index]
-        return self.cur_tok
+        self.cur_type = self.types[self.cur_index]
     
     def next_tok(self):
-        if self.cur_index+1 < len(self.tokens):
+        if self.cur_index+1 < self.n_tokens:
             return self.tokens[self.cur_index+1]
+    
+    def is_keyword(self, value):
+        return self.cur_type == KW and self.values[self.cur_index] is value
+    
+    def failure(self, info, ecode=''):
+        tok = self.cur_tok
+        return ParseError(
+            InvalidSyntaxError(tok.pos_start, tok.pos_end, info).set_ecode(ecode)
+        )
 
     def parse(self):
-        res = self.expr()
-        if res.error is None and (not self.cur_tok.is_type(t.EOF, t.NEWLINE)):
-            res.failure(
-                InvalidSyntaxError(self.cur_tok.pos_start, self.cur_tok.pos_end, 'Invalid Syntax').set_ecode('p')
-            )
-            return res
-        return res
+        node = self.expr()
+        if not self.cur_type & end_types:
+            raise self.failure('Invalid Syntax', 'p')
+        return node
 
     def expr(self):
-        res = ParseResult()
-    
-        if self.cur_tok.is_equals(t.KW, 'let'):
-            res.register_adv()
+        if self.is_keyword('let'):
             self.advance()
         
-            if not self.cur_tok.is_type(t.IDENTIFIER):
-                return res.failure(
-                    InvalidSyntaxError(self.cur_tok.pos_start, self.cur_tok.pos_end, "Expected identifier")
-                )
+            if self.cur_type != IDENTIFIER:
+                raise self.failure("Expected identifier")
         
             var_name = self.cur_tok
-            res.register_adv()
             self.advance()
         
-            if not self.cur_tok.is_type(t.EQ):
-                return res.failure(
-                    InvalidSyntaxError(self.cur_tok.pos_start, self.cur_tok.pos_end, "Expected '='")
-                )
+            if self.cur_type != EQ:
+                raise self.failure("Expected '='")
         
-            res.register_adv()
             self.advance()
-            expr = res.register(self.expr())
-            if res.error: return res
+            expr = self.expr()
         
-            return res.success(
-                VarAssignNode(var_name, expr)
-            )
+            return VarAssignNode(var_name, expr)
     
-        node = res.register(self.bin_oper(self.comp_expr, ((t.KW, 'and'), (t.KW, 'or'))))
-        if res.error: return res
-    
-        if res.error: return res.failure(
-            InvalidSyntaxError(self.cur_tok.pos_start, self.cur_tok.pos_end,
-                               "Expected Expression: let, int, float, identifier, '+', '-' or '('").set_ecode('xp')
-        )
-        
-        return res.success(node)
+        return self.bin_oper(self.comp_expr, no_operators, logic_keywords)
     
     def call(self):
-        res = ParseResult()
-        
-        atom = res.register(self.atom())
-        if res.error: return res
+        atom = self.atom()
         
-        if self.cur_tok.is_type(t.L_PAREN):
+        if self.cur_type == L_PAREN:
             args = []
-            res.register_adv()
             self.advance()
             
-            if not self.cur_tok.is_type(t.R_PAREN):
-                arg = res.register(self.expr())
-                if res.error: return res
-                args.append(arg)
+            if self.cur_type != R_PAREN:
+                args.append(self.expr())
                 
-                while self.cur_tok.is_type(t.COMMA):
-                    res.register_adv()
+                while self.cur_type == COMMA:
                     self.advance()
                     
-                    arg = res.register(self.expr())
-                    if res.error: return res
-                    args.append(arg)
+                    args.append(self.expr())
                     
-                    if self.cur_tok.is_type(t.R_PAREN):
+                    if self.cur_type == R_PAREN:
                         break
-                    elif not self.cur_tok.is_type(t.COMMA):
-                        return res.failure(
-                            InvalidSyntaxError(self.cur_tok.pos_start, self.cur_tok.pos_end, "Expected ',' or ')'")
-                        )
+                    elif self.cur_type != COMMA:
+                        raise self.failure("Expected ',' or ')'")
                 
-                if not self.cur_tok.is_type(t.R_PAREN):
-                    return res.failure(
-                        InvalidSyntaxError(self.cur_tok.pos_start, self.cur_tok.pos_end, "Expected ')'")
-                    )
-            pos_end = self.cur_tok.pos_end.copy()
-            res.register_adv()
+                if self.cur_type != R_PAREN:
+                    raise self.failure("Expected ')'")
+            pos_end = self.cur_tok.pos_end
             self.advance()
             
-            return res.success(FuncCallNode(atom, args).set_pos(atom.pos_start, pos_end))
-        return res.success(atom)
+            return FuncCallNode(atom, args).set_pos(atom.pos_start, pos_end)
+        return atom
 
     def atom(self):
-        res = ParseResult()
         tok = self.cur_tok
         
-        if tok.is_type(t.INT, t.FLOAT):
-            res.register_adv()
+        if self.cur_type & number_types:
             self.advance()
-            return res.success(NumberNode(tok))
+            return NumberNode(tok)
         
-        elif tok.is_type(t.LITERAL):
-            res.register_adv()
+        elif self.cur_type == LITERAL:
             self.advance()
-            return res.success(LiteralNode(tok))
+            return LiteralNode(tok)
         
-        elif tok.is_type(t.L_PAREN):
-            res.register_adv()
+        elif self.cur_type == L_PAREN:
             self.advance()
-            expr = res.register(self.expr())
-            if res.error: return res
-            if self.cur_tok.is_type(t.R_PAREN):
-                res.register_adv()
+            expr = self.expr()
+            if self.cur_type == R_PAREN:
                 self.advance()
-                return res.success(expr)
+                return expr
             else:
-                return res.failure(InvalidSyntaxError(self.cur_tok.pos_start, self.cur_tok.pos_end, "Expected ')'"))
+                raise self.failure("Expected ')'")
         
-        elif tok.is_type(t.IDENTIFIER):
-            res.register_adv()
+        elif self.cur_type == IDENTIFIER:
             self.advance()
-            return res.success(VarAccessNode(tok))
+            return VarAccessNode(tok)
         
-        elif tok.is_equals(t.KW, 'if'):
-            node = res.register(self.if_expr())
-            
-            return res.success(node)
+        elif self.is_keyword('if'):
+            return self.if_expr()
         
-        elif tok.is_equals(t.KW, 'fun'):
-            node = res.register(self.func_def())
-            
-            return res.success(node)
+        elif self.is_keyword('fun'):
+            return self.func_def()
         
-        return res.failure(
-            InvalidSyntaxError(tok.pos_start, tok.pos_end, "Expected Value: identifier, int, float, '+', '-' or '('")
-        )
+        raise self.failure("Expected Value: identifier, int, float, '+', '-' or '('")
     
     def factor(self):
-        res = ParseResult()
         tok = self.cur_tok
         
-        if tok.is_type(t.PLUS, t.MINUS):
-            res.register_adv()
+        if self.cur_type & unary_operators:
             self.advance()
-            factor = res.register(self.factor())
-            if res.error: return res
-            return res.success(UnaryOpNode(tok, factor))
+            return UnaryOpNode(tok, self.factor())
         
         return self.power()
     
     def term(self):
-        return self.bin_oper(self.factor, (t.MUL, t.DIV))
+        return self.bin_oper(self.factor, term_operators)
 
     def power(self):
-        return self.bin_oper(self.call, (t.POW,), self.factor)
+        return self.bin_oper(self.call, power_operators, func_right=self.factor)
 
     def arith_expr(self):
-        return self.bin_oper(self.term, (t.PLUS, t.MINUS))
+        return self.bin_oper(self.term, arith_operators)
     
     def comp_expr(self):
-        res = ParseResult()
-        if self.cur_tok.is_equals(t.KW, 'not'):
+        if self.is_keyword('not'):
             op_tok = self.cur_tok
-            res.register_adv()
             self.advance()
             
-            node = res.register(self.comp_expr())
-            if res.error: return res
-            
-            return res.success(UnaryOpNode(op_tok, node))
-        node = res.register(self.bin_oper(self.arith_expr, (t.EE, t.NE, t.LT, t.GT, t.LTE, t.GTE)))
-        
-        if res.error: return res
+            return UnaryOpNode(op_tok, self.comp_expr())
         
-        return res.success(node)
+        return self.bin_oper(self.arith_expr, comp_operators)
 
-    def bin_oper(self, func_left, operators, func_right=None):
+    def bin_oper(self, func_left, operators, keywords=no_keywords, func_right=None):
+        # operators: token types that continue the chain, keywords: KW values that do
         if func_right is None:
             func_right = func_left
         
-        res = ParseResult()
+        values = self.values
+        left = func_left()
         
-        left = res.register(func_left())
-        if res.error:
-            return res
-        
-        while self.cur_tok.is_type(*operators) or (self.cur_tok.type_, self.cur_tok.value) in operators:
+        while self.cur_type & operators or (self.cur_type == KW and values[self.cur_index] in keywords):
             op_tok = self.cur_tok
-            res.register_adv()
             self.advance()
-            right = res.register(func_right())
-            if res.error: return res
+            right = func_right()
             
             left = BinOpNode(left, op_tok, right)
         
-        return res.success(left)
+        return left
 
     def if_expr(self):
         # self.cur_tok is KW:if
-        res = ParseResult()
-        res.register_adv()
         self.advance()
     
-        cond = res.register(self.comp_expr())
-        if res.error: return res
+        cond = self.comp_expr()
     
-        if not self.cur_tok.is_equals(t.KW, 'then'):
-            return res.failure(
-                InvalidSyntaxError(self.cur_tok.pos_start, self.cur_tok.pos_end, "Expected 'then'")
-            )
-        res.register_adv()
+        if not self.is_keyword('then'):
+            raise self.failure("Expected 'then'")
         self.advance()
     
-        expr = res.register(self.expr())
-        if res.error: return res
+        expr = self.expr()
     
-        if not self.cur_tok.is_equals(t.KW, 'else'):
-            return res.failure(
-                InvalidSyntaxError(self.cur_tok.pos_start, self.cur_tok.pos_end, "Expected 'else'")
-            )
+        if not self.is_keyword('else'):
+            raise self.failure("Expected 'else'")
     
-        res.register_adv()
         self.advance()
     
-        else_expr = res.register(self.expr())
-        if res.error: return res
+        else_expr = self.expr()
     
-        return res.success(IfBlockNode((cond, expr), else_expr))
+        return IfBlockNode((cond, expr), else_expr)
     
     def func_def(self):
         # self.cur_tok is KW:fun
-        res = ParseResult()
-        res.register_adv()
         name = ''
         pos_start = self.cur_tok.pos_start
-        res.register_adv()
         self.advance()
         
-        if self.cur_tok.is_type(t.IDENTIFIER):
-            name = self.cur_tok.value
-            res.register_adv()
+        if self.cur_type == IDENTIFIER:
+            name = self.values[self.cur_index]
             self.advance()
 
-        if not self.cur_tok.is_type(t.L_PAREN):
-            return res.failure(
-                InvalidSyntaxError(self.cur_tok.pos_start, self.cur_tok.pos_end,
-                                   "Expected '('" if name else "Expected Identifier or '('")
-            )
-        res.register_adv()
+        if self.cur_type != L_PAREN:
+            raise self.failure("Expected '('" if name else "Expected Identifier or '('")
         self.advance()
         
         parameters = []
-        if self.cur_tok.is_type(t.IDENTIFIER):
+        if self.cur_type == IDENTIFIER:
             parameters.append(self.cur_tok)
-            res.register_adv()
             self.advance()
 
-            while self.cur_tok.is_type(t.COMMA):
-                res.register_adv()
+            while self.cur_type == COMMA:
                 self.advance()
                 
-                if self.cur_tok.is_type(t.IDENTIFIER):
+                if self.cur_type == IDENTIFIER:
                     parameters.append(self.cur_tok)
-                    res.register_adv()
                     self.advance()
-                elif self.cur_tok.is_type(t.R_PAREN):
+                elif self.cur_type == R_PAREN:
                     break
                 else:
-                    return res.failure(
-                        InvalidSyntaxError(self.cur_tok.pos_start, self.cur_tok.pos_end, "Expected ',' or ')'")
-                    )
+                    raise self.failure("Expected ',' or ')'")
         
-        if not self.cur_tok.is_type(t.R_PAREN):
-            return res.failure(
-                InvalidSyntaxError(self.cur_tok.pos_start, self.cur_tok.pos_end, "Invalid Syntax").set_ecode('fd')
-            )
+        if self.cur_type != R_PAREN:
+            raise self.failure("Invalid Syntax", 'fd')
         
-        res.register_adv()
         self.advance()
-        if not self.cur_tok.is_type(t.COLON):
-            return res.failure(
-                InvalidSyntaxError(self.cur_tok.pos_start, self.cur_tok.pos_end, "Expected ':'")
-            )
-        res.register_adv()
+        if self.cur_type != COLON:
+            raise self.failure("Expected ':'")
         self.advance()
         
-        expr = res.register(self.expr())
-        if res.error:
-            return res
+        expr = self.expr()
 
-        return res.success(
-            FuncDefNode(name, parameters, expr).set_pos(pos_start, expr.pos_end)
-        )
+        return FuncDefNode(name, parameters, expr).set_pos(pos_start, expr.pos_end)
 
 
 def make_ast(tokens):
     parser = Parser(tokens)
-    res = parser.parse()
-    return res.node, res.error
+    try:
+        return parser.parse(), None
+    except ParseError as e:
+        return None, e.error
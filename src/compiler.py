@@ -0,0 +1,277 @@
+"""
+Bytecode compiler
+"""
+from token_kinds import PLUS, MINUS, MUL, DIV, POW, EE, NE, LT, GT, LTE, GTE, KW
+
+import ast_parser
+
+
+# opcodes
+LOAD_CONST = 0
+LOAD_BOOL = 1
+LOAD_VAR = 2
+STORE_VAR = 3
+
+BINOP_ADD = 4
+BINOP_SUB = 5
+BINOP_MUL = 6
+BINOP_DIV = 7
+BINOP_POW = 8
+
+BINOP_EE = 9
+BINOP_NE = 10
+BINOP_LT = 11
+BINOP_GT = 12
+BINOP_LTE = 13
+BINOP_GTE = 14
+
+BINOP_AND = 15
+BINOP_OR = 16
+
+UNARY_NEG = 17
+UNARY_NOT = 18
+
+JUMP = 19
+JUMP_IF_FALSE = 20
+
+MAKE_FUNCTION = 21
+CALL = 22
+
+LOAD_FAST = 23
+
+op_names = (
+    'LOAD_CONST', 'LOAD_BOOL', 'LOAD_VAR', 'STORE_VAR',
+    'BINOP_ADD', 'BINOP_SUB', 'BINOP_MUL', 'BINOP_DIV', 'BINOP_POW',
+    'BINOP_EE', 'BINOP_NE', 'BINOP_LT', 'BINOP_GT', 'BINOP_LTE', 'BINOP_GTE',
+    'BINOP_AND', 'BINOP_OR',
+    'UNARY_NEG', 'UNARY_NOT',
+    'JUMP', 'JUMP_IF_FALSE',
+    'MAKE_FUNCTION', 'CALL',
+    'LOAD_FAST',
+)
+
+# operator token (type, value) -> opcode
+binop_opcodes = {
+    (PLUS, None): BINOP_ADD,
+    (MINUS, None): BINOP_SUB,
+    (MUL, None): BINOP_MUL,
+    (DIV, None): BINOP_DIV,
+    (POW, None): BINOP_POW,
+
+    (EE, None): BINOP_EE,
+    (NE, None): BINOP_NE,
+    (LT, None): BINOP_LT,
+    (GT, None): BINOP_GT,
+    (LTE, None): BINOP_LTE,
+    (GTE, None): BINOP_GTE,
+
+    (KW, 'and'): BINOP_AND,
+    (KW, 'or'): BINOP_OR,
+}
+
+# opcode -> Object method implementing it, passed as the instruction's arg
+binop_methods = {
+    BINOP_ADD: 'operate_plus',
+    BINOP_SUB: 'operate_minus',
+    BINOP_MUL: 'operate_mul',
+    BINOP_DIV: 'operate_div',
+    BINOP_POW: 'operate_pow',
+
+    BINOP_EE: 'compare_eq',
+    BINOP_NE: 'compare_ne',
+    BINOP_LT: 'compare_lt',
+    BINOP_GT: 'compare_gt',
+    BINOP_LTE: 'compare_lte',
+    BINOP_GTE: 'compare_gte',
+
+    BINOP_AND: 'logic_and',
+    BINOP_OR: 'logic_or',
+}
+
+
+class Code:
+    def __init__(self, name, parameters=()):
+        self.name = name
+        self.parameters = parameters
+        self.bind_parameters = True  # parameters must also be set in the symbol map
+        self.defines_functions = False
+        self.instructions = []  # (opcode, arg) pairs
+        self.positions = []  # (pos_start, pos_end) of the node each instruction came from
+        self.consts = []
+        self.handlers = None  # instructions with their VM handlers, cached by the interpreter
+
+    def __repr__(self):
+        return f"<Code {self.name}>"
+
+    def emit(self, opcode, arg, node):
+        self.instructions.append((opcode, arg))
+        self.positions.append((node.pos_start, node.pos_end))
+        return len(self.instructions) - 1
+
+    def patch(self, index, arg):
+        self.instructions[index] = (self.instructions[index][0], arg)
+
+    def add_const(self, value):
+        self.consts.append(value)
+        return len(self.consts) - 1
+
+    def disassemble(self):
+        lines = []
+        for i, (opcode, arg) in enumerate(self.instructions):
+            if opcode in (LOAD_CONST, MAKE_FUNCTION):
+                arg = f'{arg} ({self.consts[arg]!r})'
+            elif opcode == LOAD_FAST:
+                arg = f'{arg} ({self.parameters[arg].value})'
+            lines.append(f'{i:>4} {op_names[opcode]:<14} {"" if arg is None else arg}')
+        return '\n'.join(lines)
+
+
+class Resolver:
+    """Finds the names a function body rebinds, and whether it defines functions"""
+    def __init__(self):
+        self.assigned = set()
+        self.defines_functions = False
+
+    def visit(self, node):
+        nodes = [node]  # walked with a list rather than by recursing, so long chains fit
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, ast_parser.VarAssignNode):
+                self.assigned.add(node.var_name.value)
+                nodes.append(node.value)
+            elif isinstance(node, ast_parser.FuncDefNode):
+                # the function is stored under its name, its body is resolved on its own
+                self.assigned.add(node.name)
+                self.defines_functions = True
+            elif isinstance(node, ast_parser.BinOpNode):
+                nodes.append(node.left)
+                nodes.append(node.right)
+            elif isinstance(node, ast_parser.UnaryOpNode):
+                nodes.append(node.node)
+            elif isinstance(node, ast_parser.IfBlockNode):
+                nodes.extend((node.case[0], node.case[1], node.else_expr))
+            elif isinstance(node, ast_parser.FuncCallNode):
+                nodes.append(node.node_to_call)
+                nodes.extend(node.arguments)
+
+
+class Compiler:
+    def __init__(self, name, parameters=(), resolver=None):
+        self.code = Code(name, parameters)
+        # parameter name -> frame slot, for parameters the body never rebinds
+        self.slots = {}
+        self.work = []
+
+        if resolver is not None:
+            self.slots = {
+                tok.value: i for i, tok in enumerate(parameters) if tok.value not in resolver.assigned
+            }
+            self.code.defines_functions = resolver.defines_functions
+            # nested functions look parameters up through the symbol map
+            self.code.bind_parameters = resolver.defines_functions or len(self.slots) < len(parameters)
+
+    def compile(self, node) -> Code:
+        # steps still to run, last one first: a node to compile or a (method, arg)
+        # pair to call, so nested expressions don't recurse into visit
+        work = self.work
+        work.append(node)
+        while work:
+            step = work.pop()
+            if step.__class__ is tuple:
+                method, arg = step
+                method(self, arg)
+            else:
+                self.visit(step)
+        return self.code
+
+    def then(self, *steps):
+        """Runs the steps in order before whatever was scheduled already"""
+        self.work.extend(reversed(steps))
+
+    def visit(self, node):
+        method = self.dispatch.get(type(node), Compiler.no_visit_method)
+        method(self, node)
+
+    def no_visit_method(self, node):
+        raise Exception(f'visit_{type(node).__name__} method is not defined')
+
+    def visit_NumberNode(self, node: ast_parser.NumberNode):
+        self.code.emit(LOAD_CONST, self.code.add_const(node.tok.value), node)
+
+    def visit_LiteralNode(self, node: ast_parser.LiteralNode):
+        self.code.emit(LOAD_BOOL, node.tok.value == 'true', node)
+
+    def visit_VarAccessNode(self, node: ast_parser.VarAccessNode):
+        var_name = node.var_name.value
+        if var_name in self.slots:
+            self.code.emit(LOAD_FAST, self.slots[var_name], node)
+        else:
+            self.code.emit(LOAD_VAR, var_name, node)
+
+    def visit_VarAssignNode(self, node: ast_parser.VarAssignNode):
+        self.then(node.value, (Compiler.emit_store, node))
+
+    def emit_store(self, node: ast_parser.VarAssignNode):
+        self.code.emit(STORE_VAR, node.var_name.value, node)
+
+    def visit_BinOpNode(self, node: ast_parser.BinOpNode):
+        self.then(node.left, node.right, (Compiler.emit_binop, node))
+
+    def emit_binop(self, node: ast_parser.BinOpNode):
+        opcode = binop_opcodes[node.oper.type_, node.oper.value]
+        self.code.emit(opcode, binop_methods[opcode], node)
+
+    def visit_UnaryOpNode(self, node: ast_parser.UnaryOpNode):
+        self.then(node.node, (Compiler.emit_unary, node))
+
+    def emit_unary(self, node: ast_parser.UnaryOpNode):
+        if node.oper.type_ == MINUS:
+            self.code.emit(UNARY_NEG, None, node)
+        elif node.oper.is_equals(KW, 'not'):
+            self.code.emit(UNARY_NOT, None, node)
+
+    def visit_IfBlockNode(self, node: ast_parser.IfBlockNode):
+        self.then(node.case[0], (Compiler.emit_if_test, node))
+
+    def emit_if_test(self, node: ast_parser.IfBlockNode):
+        jump_to_else = self.code.emit(JUMP_IF_FALSE, None, node)
+        self.then(node.case[1], (Compiler.emit_if_else, (node, jump_to_else)))
+
+    def emit_if_else(self, arg):
+        node, jump_to_else = arg
+        jump_to_end = self.code.emit(JUMP, None, node)
+
+        self.code.patch(jump_to_else, len(self.code.instructions))
+        self.then(node.else_expr, (Compiler.patch_jump, jump_to_end))
+
+    def patch_jump(self, index):
+        """Points the jump at index to the next instruction"""
+        self.code.patch(index, len(self.code.instructions))
+
+    def visit_FuncDefNode(self, node: ast_parser.FuncDefNode):
+        resolver = Resolver()
+        resolver.visit(node.body)
+        body = Compiler(node.name, node.parameters, resolver).compile(node.body)
+        self.code.emit(MAKE_FUNCTION, self.code.add_const(body), node)
+
+    def visit_FuncCallNode(self, node: ast_parser.FuncCallNode):
+        self.then(node.node_to_call, *node.arguments, (Compiler.emit_call, node))
+
+    def emit_call(self, node: ast_parser.FuncCallNode):
+        self.code.emit(CALL, len(node.arguments), node)
+
+    dispatch = {
+        ast_parser.NumberNode: visit_NumberNode,
+        ast_parser.LiteralNode: visit_LiteralNode,
+        ast_parser.VarAccessNode: visit_VarAccessNode,
+        ast_parser.VarAssignNode: visit_VarAssignNode,
+        ast_parser.BinOpNode: visit_BinOpNode,
+        ast_parser.UnaryOpNode: visit_UnaryOpNode,
+        ast_parser.IfBlockNode: visit_IfBlockNode,
+        ast_parser.FuncDefNode: visit_FuncDefNode,
+        ast_parser.FuncCallNode: visit_FuncCallNode,
+    }
+
+
+def compile_ast(node) -> Code:
+    return Compiler('<module>').compile(node)
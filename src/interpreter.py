@@ -1,27 +1,35 @@
-from tokens import t
+import operator
 
-from utils import RTError
+from utils import RTError, InvalidSyntaxError
 
 # for type hinting
 from typing import Optional
-import ast_parser
+
+import compiler
 
 # for run function
 from tokenizer import tokenize
 from ast_parser import make_ast
+from optimizer import fold_constants
+from compiler import compile_ast
 
 
 class Object:
+    __slots__ = ('type_name', 'pos_start', 'pos_end', 'context')
+    
+    # whether instances never change after creation, so may be shared instead of copied
+    IMMUTABLE = False
+    
     type_name: str
     pos_start: Optional[int]
     pos_end: Optional[int]
     context: Optional["Context"]
     
-    def __init__(self, type_name='Object'):
+    def __init__(self, type_name='Object', pos_start=None, pos_end=None, context=None):
         self.type_name = type_name
-        self.pos_start = None
-        self.pos_end = None
-        self.context = None
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+        self.context = context
 
     def set_pos(self, pos_start=None, pos_end=None):
         self.pos_start = pos_start
@@ -33,7 +41,7 @@ class Object:
         return self
     
     def is_truthy(self):
-        return Bool(True)
+        return TRUE
     
     def __repr__(self):
         return f"<object-of-type-{self.type_name}>"
@@ -89,14 +97,13 @@ class Object:
 
 
 class Bool(Object):
-    def __init__(self, value):
-        Object.__init__(self)
+    __slots__ = ('value',)
+    
+    IMMUTABLE = True
+    
+    def __init__(self, value, pos_start=None, pos_end=None, context=None):
+        Object.__init__(self, 'Bool', pos_start, pos_end, context)
         self.value = bool(value)
-        self.type_name = 'Bool'
-        
-        self.pos_start = None
-        self.pos_end = None
-        self.context = None
     
     def __repr__(self):
         return 'true' if self.value else 'false'
@@ -105,30 +112,33 @@ class Bool(Object):
         return self.value
     
     def is_truthy(self):
-        return Bool(self.value)
+        return TRUE if self.value else FALSE
     
     def copy(self):
-        return Bool(self.value).set_pos(self.pos_start, self.pos_end).set_context(self.context)
+        return Bool(self.value, self.pos_start, self.pos_end, self.context)
     
     def logic_and(self, other):
-        return Bool(self.value and other.value).set_context(self.context), None
+        return (TRUE if self.value and other.value else FALSE), None
     
     def logic_or(self, other):
-        return Bool(self.value or other.value).set_context(self.context), None
+        return (TRUE if self.value or other.value else FALSE), None
     
     def logic_not(self):
-        return Bool(not self.value).set_context(self.context)
+        return (FALSE if self.value else TRUE), None
+
+
+TRUE = Bool(True)
+FALSE = Bool(False)
 
 
 class Number(Object):
-    def __init__(self, value):
-        Object.__init__(self)
+    __slots__ = ('value',)
+    
+    IMMUTABLE = True
+    
+    def __init__(self, value, pos_start=None, pos_end=None, context=None):
+        Object.__init__(self, 'Number', pos_start, pos_end, context)
         self.value = value
-        self.type_name = 'Number'
-        
-        self.pos_start = None
-        self.pos_end = None
-        self.context = None
     
     def __repr__(self):
         return str(self.value)
@@ -137,30 +147,27 @@ class Number(Object):
         return bool(self.value)
 
     def copy(self):
-        copy = Number(self.value)
-        copy.set_pos(self.pos_start, self.pos_end)
-        copy.set_context(self.context)
-        return copy
+        return Number(self.value, self.pos_start, self.pos_end, self.context)
     
     def is_truthy(self):
-        return Bool(bool(self.value))
+        return TRUE if self.value else FALSE
     
     # arithmetic operations
     def operate_plus(self, other):
         if isinstance(other, Number):
-            return Number(self.value + other.value).set_context(self.context), None
+            return Number(self.value + other.value, context=self.context), None
         else:
             return Object.operate_plus(self, other)  # makes not supported error
     
     def operate_minus(self, other):
         if isinstance(other, Number):
-            return Number(self.value - other.value).set_context(self.context), None
+            return Number(self.value - other.value, context=self.context), None
         else:
             return Object.operate_minus(self, other)  # makes not supported error
     
     def operate_mul(self, other):
         if isinstance(other, Number):
-            return Number(self.value * other.value).set_context(self.context), None
+            return Number(self.value * other.value, context=self.context), None
         else:
             return Object.operate_mul(self, other)  # makes not supported error
     
@@ -168,74 +175,81 @@ class Number(Object):
         if isinstance(other, Number):
             if other.value == 0:
                 return None, RTError(other.pos_start, other.pos_end, "Division by Zero", self.context)
-            return Number(self.value / other.value).set_context(self.context), None
+            return Number(self.value / other.value, context=self.context), None
         else:
             return Object.operate_div(self, other)  # makes not supported error
     
     def operate_pow(self, other):
         if isinstance(other, Number):
-            return Number(self.value ** other.value).set_context(self.context), None
+            return Number(self.value ** other.value, context=self.context), None
         else:
             return Object.operate_pow(self, other)  # makes not supported error
     
     # boolean operations
     def compare_eq(self, other):
         if isinstance(other, Number):
-            return Bool(self.value == other.value).set_context(self.context), None
+            return (TRUE if self.value == other.value else FALSE), None
         else:
             return Object.compare_eq(self, other)  # makes not supported error
 
     def compare_ne(self, other):
         if isinstance(other, Number):
-            return Bool(self.value != other.value).set_context(self.context), None
+            return (TRUE if self.value != other.value else FALSE), None
         else:
             return Object.compare_ne(self, other)  # makes not supported error
 
     def compare_gt(self, other):
         if isinstance(other, Number):
-            return Bool(self.value > other.value).set_context(self.context), None
+            return (TRUE if self.value > other.value else FALSE), None
         else:
             return Object.compare_gt(self, other)  # makes not supported error
         
     def compare_lt(self, other):
         if isinstance(other, Number):
-            return Bool(self.value < other.value).set_context(self.context), None
+            return (TRUE if self.value < other.value else FALSE), None
         else:
             return Object.compare_lt(self, other)  # makes not supported error
 
     def compare_gte(self, other):
         if isinstance(other, Number):
-            return Bool(self.value >= other.value).set_context(self.context), None
+            return (TRUE if self.value >= other.value else FALSE), None
         else:
             return Object.compare_gte(self, other)  # makes not supported error
 
     def compare_lte(self, other):
         if isinstance(other, Number):
-            return Bool(self.value <= other.value).set_context(self.context), None
+            return (TRUE if self.value <= other.value else FALSE), None
         else:
             return Object.compare_lte(self, other)  # makes not supported error
     
     # logical operations
     def logic_and(self, other):
         if isinstance(other, Number):
-            return Bool(int(self.value and other.value)).set_context(self.context), None
+            return (TRUE if int(self.value and other.value) else FALSE), None
         else:
             return Object.logic_and(self, other)  # makes not supported error
 
     def logic_or(self, other):
         if isinstance(other, Number):
-            return Bool(int(self.value or other.value)).set_context(self.context), None
+            return (TRUE if int(self.value or other.value) else FALSE), None
         else:
             return Object.logic_or(self, other)  # makes not supported error
     
     def logic_not(self):
-        return Bool(int(not self.value)).set_context(self.context), None
+        return (FALSE if self.value else TRUE), None
+
+
+# most contexts Interpreter.context_pool keeps for reuse
+CONTEXT_POOL_SIZE = 64
 
 
 class Function(Object):
-    def __init__(self, name, parameters, body):
-        Object.__init__(self)
-        self.type_name = "Function"
+    __slots__ = ('name', 'parameters', 'n_parameters', 'body')
+    
+    IMMUTABLE = True
+    
+    def __init__(self, name, parameters, body, pos_start=None, pos_end=None, context=None):
+        Object.__init__(self, 'Function', pos_start, pos_end, context)
         self.name = name
         self.parameters = parameters
         self.n_parameters = len(parameters)
@@ -244,52 +258,47 @@ class Function(Object):
     def __repr__(self):
         return f"<Function {self.name}>"
     
-    def execute(self, args):
-        res = RTResult()
-        context = Context(self.name, self.context, self.pos_start, SymbolMap(self.context.symbol_map))
-        
+    def enter(self, args, pos_start, pos_end, context_pool):
+        """Context for a call of the function, pos_start and pos_end are of the call"""
         if self.n_parameters != len(args):
-            return res.failure(
-                RTError(self.pos_start, self.pos_end, ("Too many" if len(args) > self.n_parameters else "Not enough") +
-                        f" arguments given into {self.name}, takes {len(self.parameters)}", context)
-            )
+            context = Context(self.name, self.context, pos_start)
+            return None, RTError(pos_start, pos_end,
+                                 ("Too many" if len(args) > self.n_parameters else "Not enough") +
+                                 f" arguments given into {self.name}, takes {len(self.parameters)}", context)
         
-        interpreter = Interpreter()
+        if context_pool:
+            context = context_pool.pop()
+            context.display_name = self.name
+            context.parent = self.context
+            context.parent_entry_pos = pos_start
+            context.symbol_map.parent = self.context.symbol_map
+        else:
+            context = Context(self.name, self.context, pos_start, SymbolMap(self.context.symbol_map))
         
-        # setting parameters to given values
-        for i in range(self.n_parameters):
-            parameter = self.parameters[i]
-            arg = args[i]
-            context.symbol_map.set(parameter.value, arg)
+        # setting parameters to given values, the body reads them from its frame slots
+        if self.body.bind_parameters:
+            for i in range(self.n_parameters):
+                parameter = self.parameters[i]
+                arg = args[i]
+                context.symbol_map.set(parameter.value, arg)
         
-        value = res.register(interpreter.visit(self.body, context))
-        if res.error: return res
-        return res.success(value)
+        return context, None
     
-    def copy(self):
-        copy = Function(self.name, self.parameters, self.body).set_context(self.context).set_pos(self.pos_start, self.pos_end)
-        return copy
-
-
-class RTResult:
-    def __init__(self):
-        self.value = None
-        self.error = None
+    def leave(self, context, context_pool):
+        """Called once a call returned without error"""
+        # a context kept by a nested function can't be reused, and the pool only
+        # needs to cover the usual call depth, not the deepest recursion so far
+        if not self.body.defines_functions and len(context_pool) < CONTEXT_POOL_SIZE:
+            context.symbol_map.symbol_map.clear()
+            context_pool.append(context)
     
-    def register(self, res):
-        if res.error: self.error = res.error
-        return res.value
-
-    def success(self, value):
-        self.value = value
-        return self
-
-    def failure(self, error):
-        self.error = error
-        return self
+    def copy(self):
+        return Function(self.name, self.parameters, self.body, self.pos_start, self.pos_end, self.context)
 
 
 class Context:
+    __slots__ = ('display_name', 'parent', 'parent_entry_pos', 'symbol_map')
+    
     def __init__(self, display_name, parent=None, parent_entry_pos=None, symbol_map=None):
         self.display_name: str = display_name
         self.parent: Context = parent
@@ -298,15 +307,21 @@ class Context:
 
 
 class SymbolMap:
+    __slots__ = ('symbol_map', 'parent')
+    
     def __init__(self, parent=None):
         self.symbol_map = {}
         self.parent = parent
     
     def get(self, var_name):
-        value = self.symbol_map.get(var_name, None)
-        if value is None and self.parent:
-            return self.parent.get(var_name)
-        return value
+        # walk the enclosing scopes in a loop rather than a call per level
+        symbol_map = self
+        while symbol_map is not None:
+            value = symbol_map.symbol_map.get(var_name)
+            if value is not None:
+                return value
+            symbol_map = symbol_map.parent
+        return None
     
     def set(self, var_name, value):
         self.symbol_map[var_name] = value
@@ -315,158 +330,242 @@ class SymbolMap:
         del self.symbol_map[var_name]
 
 
+# numbers live on the VM stack and in symbol maps as plain Python values,
+# they are only wrapped in Number objects to meet other objects or the host
+number_types = (int, float, complex)
+
+number_operations = {
+    'operate_plus': operator.add,
+    'operate_minus': operator.sub,
+    'operate_mul': operator.mul,
+    'operate_div': operator.truediv,
+    'operate_pow': operator.pow,
+    
+    'compare_eq': lambda left, right: TRUE if left == right else FALSE,
+    'compare_ne': lambda left, right: TRUE if left != right else FALSE,
+    'compare_lt': lambda left, right: TRUE if left < right else FALSE,
+    'compare_gt': lambda left, right: TRUE if left > right else FALSE,
+    'compare_lte': lambda left, right: TRUE if left <= right else FALSE,
+    'compare_gte': lambda left, right: TRUE if left >= right else FALSE,
+    
+    # the chosen operand is truncated to an int, so 0.5 counts as false here
+    'logic_and': lambda left, right: TRUE if int(left and right) else FALSE,
+    'logic_or': lambda left, right: TRUE if int(left or right) else FALSE,
+}
+
+
+def box(value, context=None):
+    if value.__class__ in number_types:
+        return Number(value, context=context)
+    return value
+
+
+def unbox(value):
+    if value.__class__ is Number:
+        return value.value
+    return value
+
+
+class Frame:
+    __slots__ = ('code', 'context', 'fast', 'function', 'consts', 'positions', 'stack', 'ip')
+    
+    def __init__(self, code, context, fast=(), function=None):
+        self.code = code
+        self.context = context
+        self.fast = fast  # parameter values, indexed by LOAD_FAST
+        self.function = function  # the Function being called, None for the outermost frame
+        self.consts = code.consts
+        self.positions = code.positions
+        self.stack = []
+        self.ip = 0
+
+
 class Interpreter:
-    def visit(self, node, context):
-        method_name = f'visit_{type(node).__name__}'
-        method = getattr(self, method_name, self.no_visit_method)
-        return method(node, context)
-
-    def no_visit_method(self, node, context):
-        raise Exception(f'visit_{type(node).__name__} method is not defined')
-    
-    def visit_NumberNode(self, node: ast_parser.NumberNode, context):
-        return RTResult().success(
-            Number(node.tok.value).set_pos(node.pos_start, node.pos_end).set_context(context)
-        )
-    
-    def visit_LiteralNode(self, node: ast_parser.LiteralNode, context):
-        res = RTResult()
-        if node.tok.value == 'true':
-            return res.success(Bool(True).set_pos(node.pos_start, node.pos_end).set_context(context))
-        if node.tok.value == 'false':
-            return res.success(Bool(False).set_pos(node.pos_start, node.pos_end).set_context(context))
-    
-    def visit_VarAccessNode(self, node: ast_parser.VarAccessNode, context):
-        res = RTResult()
-        var_name = node.var_name.value
-        value = context.symbol_map.get(var_name)
+    def __init__(self):
+        # contexts of returned calls, reused by Function.enter
+        self.context_pool = []
+    
+    def execute(self, code, context, fast=()) -> tuple:
+        frame = Frame(code, context, fast)
+        callers = []  # frames waiting for a call to return, calls don't recurse into execute
+        handlers = self.handlers(code)
+        n_instructions = len(handlers)
         
-        if not value:
-            return res.failure(
-                RTError(node.pos_start, node.pos_end, f"'{var_name}' not defined", context)
-            )
+        while True:
+            while frame.ip < n_instructions:
+                handler, arg = handlers[frame.ip]
+                frame.ip += 1
+                result = handler(self, frame, arg)
+                if result is None:
+                    continue
+                
+                if result.__class__ is not Frame:
+                    if callers:
+                        # an error is placed at the outermost call it unwinds through
+                        outermost = callers[0]
+                        result.set_pos(*outermost.positions[outermost.ip - 1])
+                    return None, result
+                
+                # CALL gave the frame of the called function
+                callers.append(frame)
+                frame = result
+                handlers = self.handlers(frame.code)
+                n_instructions = len(handlers)
+            
+            return_value = frame.stack.pop()
+            if not callers:
+                return return_value, None
+            
+            frame.function.leave(frame.context, self.context_pool)
+            frame = callers.pop()
+            frame.stack.append(return_value)
+            handlers = self.handlers(frame.code)
+            n_instructions = len(handlers)
+    
+    def handlers(self, code):
+        """code's instructions as (handler, arg) pairs, looked up in dispatch on its first run only"""
+        handlers = code.handlers
+        if handlers is None:
+            dispatch = self.dispatch
+            handlers = code.handlers = [(dispatch[opcode], arg) for opcode, arg in code.instructions]
+        return handlers
+    
+    def located(self, frame, error):
+        # shared values such as TRUE carry no position or context of their own,
+        # errors from their methods are pinned to the instruction that ran them
+        pos_start, pos_end = frame.positions[frame.ip - 1]
+        error.context = frame.context
+        return error.set_pos(pos_start, pos_end)
+    
+    def op_LOAD_CONST(self, frame, arg):
+        frame.stack.append(frame.consts[arg])
+    
+    def op_LOAD_BOOL(self, frame, arg):
+        frame.stack.append(TRUE if arg else FALSE)
+    
+    def op_LOAD_VAR(self, frame, arg):
+        value = frame.context.symbol_map.get(arg)
         
-        value = value.copy().set_pos(node.pos_start, node.pos_end)
+        if value is None:
+            pos_start, pos_end = frame.positions[frame.ip - 1]
+            return RTError(pos_start, pos_end, f"'{arg}' not defined", frame.context)
         
-        return res.success(value)
+        # values are shared between variables, only a mutable object gets its own copy
+        if value.__class__ not in number_types and not value.IMMUTABLE:
+            value = value.copy()
+        frame.stack.append(value)
     
-    def visit_VarAssignNode(self, node: ast_parser.VarAssignNode, context):
-        res = RTResult()
-        var_name = node.var_name.value
+    def op_LOAD_FAST(self, frame, arg):
+        value = frame.fast[arg]
         
-        value = res.register(self.visit(node.value, context))
-        if res.error: return res
-
-        context.symbol_map.set(var_name, value)
-        return res.success(value)
+        if value is None:
+            pos_start, pos_end = frame.positions[frame.ip - 1]
+            var_name = frame.code.parameters[arg].value
+            return RTError(pos_start, pos_end, f"'{var_name}' not defined", frame.context)
         
-    def visit_BinOpNode(self, node: ast_parser.BinOpNode, context):
-        res = RTResult()
-        left = res.register(self.visit(node.left, context))
-        if res.error: return res
-        right = res.register(self.visit(node.right, context))
-        if res.error: return res
-        
-        oper = node.oper
+        if value.__class__ not in number_types and not value.IMMUTABLE:
+            value = value.copy()
+        frame.stack.append(value)
+    
+    def op_STORE_VAR(self, frame, arg):
+        frame.context.symbol_map.set(arg, frame.stack[-1])
+    
+    def op_BINOP(self, frame, arg):
+        stack = frame.stack
+        right = stack.pop()
+        left = stack[-1]
         
-        if oper.is_type(t.PLUS):
-            result, error = left.operate_plus(right)
-        elif oper.is_type(t.MINUS):
-            result, error = left.operate_minus(right)
-        elif oper.is_type(t.MUL):
-            result, error = left.operate_mul(right)
-        elif oper.is_type(t.DIV):
-            result, error = left.operate_div(right)
-        elif oper.is_type(t.POW):
-            result, error = left.operate_pow(right)
+        if left.__class__ in number_types and right.__class__ in number_types:
+            if right == 0 and arg == 'operate_div':
+                pos_start, pos_end = frame.positions[frame.ip - 1]
+                return RTError(pos_start, pos_end, "Division by Zero", frame.context)
             
-        elif oper.is_type(t.EE):
-            result, error = left.compare_eq(right)
-        elif oper.is_type(t.NE):
-            result, error = left.compare_ne(right)
-        elif oper.is_type(t.LT):
-            result, error = left.compare_lt(right)
-        elif oper.is_type(t.GT):
-            result, error = left.compare_gt(right)
-        elif oper.is_type(t.LTE):
-            result, error = left.compare_lte(right)
-        elif oper.is_type(t.GTE):
-            result, error = left.compare_gte(right)
+            stack[-1] = number_operations[arg](left, right)
+            return
         
-        elif oper.is_equals(t.KW, 'and'):
-            result, error = left.logic_and(right)
-        elif oper.is_equals(t.KW, 'or'):
-            result, error = left.logic_or(right)
+        # at least one side is an object, numbers take part as Number objects
+        left = box(left, frame.context)
+        right = box(right, frame.context)
+        result, error = getattr(type(left), arg)(left, right)
         
         if error:
-            return res.failure(error.set_pos(node.pos_start, node.pos_end))
-        else:
-            return res.success(result.set_pos(node.pos_start, node.pos_end))
-    
-    def visit_UnaryOpNode(self, node: ast_parser.UnaryOpNode, context):
-        res = RTResult()
-        number = res.register(self.visit(node.node, context))
-        if res.error: return res
-        
-        error = None
-        if node.oper.is_type(t.MINUS):
-            number, error = number.operate_mul(Number(-1))
-        elif node.oper.is_equals(t.KW, 'not'):
-            number, error = number.logic_not()
+            return self.located(frame, error)
+        stack[-1] = unbox(result)
+    
+    def op_UNARY_NEG(self, frame, arg):
+        value = frame.stack.pop()
+        if value.__class__ in number_types:
+            frame.stack.append(value * -1)
+            return
         
+        number, error = value.operate_mul(Number(-1))
         if error:
-            return res.failure(error)
-        else:
-            return res.success(number.set_pos(node.pos_start, node.pos_end))
-    
-    def visit_IfBlockNode(self, node: ast_parser.IfBlockNode, context):
-        res = RTResult()
-        cond = res.register(self.visit(node.case[0], context))
-        if res.error: return res
-        if cond.is_truthy():
-            value = res.register(self.visit(node.case[1], context))
-        else:
-            value = res.register(self.visit(node.else_expr, context))
-        
-        if res.error: return res
-        return res.success(value)
+            return self.located(frame, error)
+        frame.stack.append(unbox(number))
     
-    def visit_FuncDefNode(self, node: ast_parser.FuncDefNode, context):
-        res = RTResult()
-        
-        func = Function(node.name, node.parameters, node.body).set_pos(node.pos_start, node.pos_end).set_context(context)
-        context.symbol_map.set(node.name, func)
-        
-        return res.success(
-            func
-        )
+    def op_UNARY_NOT(self, frame, arg):
+        value = box(frame.stack.pop(), frame.context)
+        number, error = value.logic_not()
+        if error:
+            return self.located(frame, error)
+        frame.stack.append(number)
     
-    def visit_FuncCallNode(self, node: ast_parser.FuncCallNode, context):
-        res = RTResult()
-        args = []
+    def op_JUMP(self, frame, arg):
+        frame.ip = arg
     
-        value_to_call = res.register(self.visit(node.node_to_call, context))
-        if res.error: return res
-        value_to_call = value_to_call.copy().set_pos(node.pos_start, node.pos_end)
+    def op_JUMP_IF_FALSE(self, frame, arg):
+        value = frame.stack.pop()
+        if not (value if value.__class__ in number_types else value.is_truthy()):
+            frame.ip = arg
     
-        for arg_node in node.arguments:
-            args.append(res.register(self.visit(arg_node, context)))
-            if res.error: return res
+    def op_MAKE_FUNCTION(self, frame, arg):
+        pos_start, pos_end = frame.positions[frame.ip - 1]
+        body = frame.consts[arg]
+        
+        func = Function(body.name, body.parameters, body, pos_start, pos_end, frame.context)
+        frame.context.symbol_map.set(body.name, func)
         
-        value_to_call: Function
-        return_value = res.register(value_to_call.execute(args))
-        if res.error:
-            res.error.set_pos(node.pos_start, node.pos_end)
-            return res
-        return res.success(return_value)
+        frame.stack.append(func)
+    
+    def op_CALL(self, frame, arg):
+        pos_start, pos_end = frame.positions[frame.ip - 1]
+        stack = frame.stack
+        
+        args = stack[len(stack) - arg:]
+        del stack[len(stack) - arg:]
+        
+        value_to_call: Function = stack.pop()
+        context, error = value_to_call.enter(args, pos_start, pos_end, self.context_pool)
+        if error:
+            return error
+        return Frame(value_to_call.body, context, args, value_to_call)
+    
+    # opcode -> handler, built once instead of per instruction
+    dispatch = {
+        compiler.LOAD_CONST: op_LOAD_CONST,
+        compiler.LOAD_BOOL: op_LOAD_BOOL,
+        compiler.LOAD_VAR: op_LOAD_VAR,
+        compiler.LOAD_FAST: op_LOAD_FAST,
+        compiler.STORE_VAR: op_STORE_VAR,
+        # every BINOP_* opcode shares one handler, the instruction arg names the method
+        **dict.fromkeys(compiler.binop_methods, op_BINOP),
+        compiler.UNARY_NEG: op_UNARY_NEG,
+        compiler.UNARY_NOT: op_UNARY_NOT,
+        compiler.JUMP: op_JUMP,
+        compiler.JUMP_IF_FALSE: op_JUMP_IF_FALSE,
+        compiler.MAKE_FUNCTION: op_MAKE_FUNCTION,
+        compiler.CALL: op_CALL,
+    }
 
 
 GLOBAL_SYMBOL_MAP = SymbolMap()
 
 
-def interpret(node, context) -> RTResult:
+def interpret(node, context) -> tuple:
+    code = compile_ast(fold_constants(node))
     interpreter = Interpreter()
-    return interpreter.visit(node, context)
+    value, error = interpreter.execute(code, context)
+    return box(value, context), error
 
 
 def run(file_name, text, debug_mode=False):
@@ -477,18 +576,28 @@ def run(file_name, text, debug_mode=False):
     if error is not None:
         return None, error
     
-    node, parse_error = make_ast(tokens)
+    try:
+        node, parse_error = make_ast(tokens)
+        
+        if debug_mode:
+            print('NODE  :', node)
+            print('------')
+        
+        if parse_error is not None:
+            return None, parse_error
+        
+        node = fold_constants(node)
+        code = compile_ast(node)
+    except RecursionError:
+        # the parser still recurses into brackets and nested functions
+        return None, InvalidSyntaxError(tokens[0].pos_start, tokens[-1].pos_end,
+                                        'Code is nested too deeply')
     
     if debug_mode:
-        print('NODE  :', node)
+        print('CODE  :')
+        print(code.disassemble())
         print('------')
     
-    if parse_error is not None:
-        return None, parse_error
-    
     context = Context("<module>", symbol_map=GLOBAL_SYMBOL_MAP)
-    res = interpret(node, context)
-    if res.error:
-        return None, res.error
-    else:
-        return res.value, None
+    value, error = Interpreter().execute(code, context)
+    return box(value, context), error
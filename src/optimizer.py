@@ -0,0 +1,178 @@
+"""
+Constant folding over the AST
+"""
+import operator
+
+from token_kinds import (
+    INT, FLOAT, PLUS, MINUS, MUL, DIV, POW, EE, NE, LT, GT, LTE, GTE, LITERAL, KW,
+)
+from tokens import Token
+
+import ast_parser
+
+
+# operator token type -> what it does to two number constants
+number_binops = {
+    PLUS: operator.add,
+    MINUS: operator.sub,
+    MUL: operator.mul,
+    DIV: operator.truediv,
+    POW: operator.pow,
+
+    EE: operator.eq,
+    NE: operator.ne,
+    LT: operator.lt,
+    GT: operator.gt,
+    LTE: operator.le,
+    GTE: operator.ge,
+}
+
+# 'and' / 'or' -> what it does to two number or two bool constants,
+# truncating the chosen operand to an int like Number.logic_and does
+logic_binops = {
+    'and': lambda left, right: bool(int(left and right)),
+    'or': lambda left, right: bool(int(left or right)),
+}
+
+
+def const_value(node):
+    """Value of a NumberNode or LiteralNode, None for any other node"""
+    if isinstance(node, ast_parser.NumberNode):
+        return node.tok.value
+    if isinstance(node, ast_parser.LiteralNode):
+        return node.tok.value == 'true'
+    return None
+
+
+def fold_binop(oper: Token, left, right):
+    """Result of `left <oper> right`, or None if it has to be left to runtime"""
+    if oper.type_ == KW:
+        # numbers and bools only combine with their own kind at runtime
+        if (left.__class__ is bool) != (right.__class__ is bool):
+            return None
+        function = logic_binops[oper.value]
+    elif left.__class__ is bool or right.__class__ is bool:
+        return None  # Bool has no arithmetic or comparisons, keep its runtime error
+    else:
+        function = number_binops[oper.type_]
+
+    if oper.type_ == DIV and right == 0:
+        return None  # keep the "Division by Zero" error at runtime
+    if oper.type_ == POW and (abs(right) > 64 or abs(left) >= 2 ** 64):
+        return None  # don't build huge numbers for code that may never run
+    try:
+        return function(left, right)
+    except (ArithmeticError, TypeError):
+        return None  # e.g. ordering complex numbers
+
+
+def const_node(value, node):
+    """NumberNode or LiteralNode for `value`, spanning `node`"""
+    if value.__class__ is bool:
+        tok = Token(LITERAL, 'true' if value else 'false', node.pos_start, node.pos_end)
+        return ast_parser.LiteralNode(tok)
+    tok = Token(INT if value.__class__ is int else FLOAT, value, node.pos_start, node.pos_end)
+    return ast_parser.NumberNode(tok)
+
+
+def child_nodes(node) -> tuple:
+    """Subtrees of a node, in the order they are evaluated"""
+    if isinstance(node, ast_parser.VarAssignNode):
+        return (node.value,)
+    if isinstance(node, ast_parser.BinOpNode):
+        return (node.left, node.right)
+    if isinstance(node, ast_parser.UnaryOpNode):
+        return (node.node,)
+    if isinstance(node, ast_parser.IfBlockNode):
+        return (node.case[0], node.case[1], node.else_expr)
+    if isinstance(node, ast_parser.FuncDefNode):
+        return (node.body,)
+    if isinstance(node, ast_parser.FuncCallNode):
+        return (node.node_to_call, *node.arguments)
+    return ()
+
+
+class ConstFolder:
+    """Replaces operations on constants with their result, rewriting the tree in place"""
+    def visit(self, node):
+        # a node is folded once its children are, on a work stack rather than
+        # by recursing, so long operator chains don't hit the recursion limit
+        folded = []  # folded subtrees, a parent's children on top in order
+        work = [(node, False)]
+        while work:
+            node, children_folded = work.pop()
+            method = self.dispatch.get(type(node))
+            if method is None:
+                folded.append(node)
+            elif children_folded:
+                folded.append(method(self, node, folded))
+            else:
+                work.append((node, True))
+                work.extend((child, False) for child in reversed(child_nodes(node)))
+        return folded.pop()
+
+    def visit_VarAssignNode(self, node: ast_parser.VarAssignNode, folded):
+        node.value = folded.pop()
+        return node
+
+    def visit_BinOpNode(self, node: ast_parser.BinOpNode, folded):
+        node.right = folded.pop()
+        node.left = folded.pop()
+
+        left = const_value(node.left)
+        right = const_value(node.right)
+        if left is None or right is None:
+            return node
+
+        value = fold_binop(node.oper, left, right)
+        if value is None:
+            return node
+        return const_node(value, node)
+
+    def visit_UnaryOpNode(self, node: ast_parser.UnaryOpNode, folded):
+        node.node = folded.pop()
+        value = const_value(node.node)
+
+        if value is None:
+            return node
+
+        if node.oper.is_equals(KW, 'not'):
+            return const_node(not value, node)
+        elif value.__class__ is bool:
+            return node  # Bool has no negation, keep its runtime error
+        elif node.oper.type_ == MINUS:
+            return const_node(value * -1, node)
+        elif node.oper.type_ == PLUS:
+            return const_node(value, node)
+        return node
+
+    def visit_IfBlockNode(self, node: ast_parser.IfBlockNode, folded):
+        node.else_expr = folded.pop()
+        expr = folded.pop()
+        node.case = (folded.pop(), expr)
+        return node
+
+    def visit_FuncDefNode(self, node: ast_parser.FuncDefNode, folded):
+        node.body = folded.pop()
+        return node
+
+    def visit_FuncCallNode(self, node: ast_parser.FuncCallNode, folded):
+        n_arguments = len(node.arguments)
+        node.arguments = folded[len(folded) - n_arguments:]
+        del folded[len(folded) - n_arguments:]
+        node.node_to_call = folded.pop()
+        return node
+
+    # NumberNode, LiteralNode and VarAccessNode are left as they are
+    dispatch = {
+        ast_parser.VarAssignNode: visit_VarAssignNode,
+        ast_parser.BinOpNode: visit_BinOpNode,
+        ast_parser.UnaryOpNode: visit_UnaryOpNode,
+        ast_parser.IfBlockNode: visit_IfBlockNode,
+        ast_parser.FuncDefNode: visit_FuncDefNode,
+        ast_parser.FuncCallNode: visit_FuncCallNode,
+    }
+
+
+def fold_constants(node):
+    return ConstFolder().visit(node)
@@ -0,0 +1,195 @@
+"""
+Regression tests for the interpreter, run with `python test_interpreter.py` from src
+"""
+import unittest
+
+import interpreter
+from interpreter import run, Interpreter, Context
+from tokenizer import tokenize
+from ast_parser import make_ast
+from optimizer import fold_constants
+from compiler import compile_ast
+
+
+def compiled(text):
+    """Code for text, to run on an Interpreter of the test's own"""
+    tokens, error = tokenize('<test>', text)
+    node, error = make_ast(tokens)
+    return compile_ast(fold_constants(node))
+
+
+class CyanTestCase(unittest.TestCase):
+    def setUp(self):
+        # every test starts from an empty global scope
+        interpreter.GLOBAL_SYMBOL_MAP.symbol_map.clear()
+
+    def value_of(self, *lines):
+        """repr of the value of the last line, running the lines one by one like the shell does"""
+        value = None
+        for text in lines:
+            value, error = run('<test>', text)
+            self.assertIsNone(error, f'{text!r} failed:\n{error!r}')
+        return repr(value)
+
+    def error_of(self, *lines):
+        """(message, highlight, traceback entries) of the error from the last line"""
+        for text in lines[:-1]:
+            self.value_of(text)
+
+        value, error = run('<test>', lines[-1])
+        self.assertIsNotNone(error, f'{lines[-1]!r} gave {value!r}, expected an error')
+
+        report = repr(error).splitlines()
+        entries = [line.strip() for line in report if line.startswith('  File ')]
+        return error.info, report[-2], entries
+
+
+class TestOperators(CyanTestCase):
+    def test_arithmetic(self):
+        self.assertEqual(self.value_of('1 + 2 * 3 - 4 / 2'), '5.0')
+        self.assertEqual(self.value_of('2 ^ 3 ^ 2'), '512')
+        self.assertEqual(self.value_of('-5 + 3'), '-2')
+        self.assertEqual(self.value_of('let x = 4', '(1 + 2) * x'), '12')
+
+    def test_comparisons(self):
+        self.assertEqual(self.value_of('1 < 2'), 'true')
+        self.assertEqual(self.value_of('2 == 2.0'), 'true')
+        self.assertEqual(self.value_of('3 >= 4'), 'false')
+        self.assertEqual(self.value_of('let x = 3', 'x != 3'), 'false')
+
+    def test_logic_truncates_numbers(self):
+        # the chosen operand is truncated to an int, folded or not
+        self.assertEqual(self.value_of('0.5 or 2'), 'false')
+        self.assertEqual(self.value_of('2 and 0.5'), 'false')
+        self.assertEqual(self.value_of('3 and -0.5'), 'false')
+        self.assertEqual(self.value_of('1.5 and 2'), 'true')
+        self.assertEqual(self.value_of('if (0.5 or 0.5) then 1 else 2'), '2')
+        self.assertEqual(self.value_of('let h = 0.5', 'h or h'), 'false')
+
+    def test_bool_logic(self):
+        self.assertEqual(self.value_of('true and false'), 'false')
+        self.assertEqual(self.value_of('true or false'), 'true')
+        self.assertEqual(self.value_of('not true'), 'false')
+        self.assertEqual(self.value_of('not (1 < 2)'), 'false')
+        self.assertEqual(self.value_of('not not 1'), 'true')
+        self.assertEqual(self.value_of('let b = false', 'not b'), 'true')
+
+    def test_mixed_operands(self):
+        self.assertEqual(self.error_of('true + 1'),
+                         ('Bool does not support + operator with Number', '~~~~~~~~',
+                          ['File <test>, line 1, in <module>.']))
+        self.assertEqual(self.error_of('1 + true')[:2],
+                         ('Number does not support + operator with Bool', '~~~~~~~~'))
+        self.assertEqual(self.error_of('1 and true')[:2],
+                         ("Number does not support 'and' logic with Bool", '~~~~~~~~~~'))
+        self.assertEqual(self.error_of('-true')[:2],
+                         ('Bool does not support * operator with Number', '~~~~~'))
+        self.assertEqual(self.error_of('let b = true', '2 * b')[:2],
+                         ('Number does not support * operator with Bool', '~~~~~'))
+
+    def test_errors_over_if_expressions(self):
+        self.assertEqual(self.error_of('-(if 1 then true else 2)')[:2],
+                         ('Bool does not support * operator with Number', '~' * 23))
+        self.assertEqual(self.error_of('1 + (if 1 then true else 2)')[:2],
+                         ('Number does not support + operator with Bool', '~' * 26))
+
+    def test_division_by_zero(self):
+        self.assertEqual(self.error_of('5 / 0')[:2], ('Division by Zero', '~~~~~'))
+        self.assertEqual(self.error_of('let x = 0', '1 + 5 / x')[:2], ('Division by Zero', '    ~~~~~'))
+
+    def test_undefined_variable(self):
+        self.assertEqual(self.error_of('1 + q')[:2], ("'q' not defined", '    ~'))
+
+    def test_long_chains(self):
+        # left-associative chains nest as deep as they are long
+        self.assertEqual(self.value_of('let x = 1', ' + '.join(['x'] * 5000)), '5000')
+        self.assertEqual(self.value_of(' - '.join(['1'] * 5000)), '-4998')
+        self.assertEqual(self.value_of('let x = 1', 'fun f(n): ' + ' * '.join(['n'] * 3000), 'f(1)'), '1')
+
+    def test_too_deeply_nested(self):
+        value, error = run('<test>', '(' * 5000 + '1' + ')' * 5000)
+        self.assertIsNone(value)
+        self.assertEqual(error.info, 'Code is nested too deeply')
+        # the interpreter is still usable afterwards
+        self.assertEqual(self.value_of('1 + 1'), '2')
+
+
+class TestVariables(CyanTestCase):
+    def test_falsy_values_are_defined(self):
+        self.assertEqual(self.value_of('let z = 0', 'z'), '0')
+        self.assertEqual(self.value_of('let f = false', 'f'), 'false')
+        self.assertEqual(self.value_of('let z = 0', 'if z then 1 else 2'), '2')
+
+    def test_falsy_arguments(self):
+        self.assertEqual(self.value_of('fun ident(v): v', 'ident(0)'), '0')
+        self.assertEqual(self.value_of('fun sel(x): if x then 1 else -1', 'sel(0)'), '-1')
+
+
+class TestFunctions(CyanTestCase):
+    def test_call(self):
+        self.assertEqual(self.value_of('fun add(a, b): a + b', 'add(1, 2)'), '3')
+        self.assertEqual(self.value_of('let d = fun (x): x * 2', 'd(4)'), '8')
+
+    def test_argument_count(self):
+        self.assertEqual(self.error_of('fun add(a, b): a + b', 'add(1)'),
+                         ('Not enough arguments given into add, takes 2', '~~~~~~',
+                          ['File <test>, line 1, in <module>.', 'File <test>, line 1, in add.']))
+        self.assertEqual(self.error_of('fun add(a, b): a + b', 'add(1, 2, 3)')[0],
+                         'Too many arguments given into add, takes 2')
+
+    def test_closures(self):
+        lines = ('fun mk(x): fun (y): x + y', 'let a = mk(1)', 'let b = mk(10)')
+        self.assertEqual(self.value_of(*lines, 'a(2)'), '3')
+        self.assertEqual(self.value_of(*lines, 'b(2)'), '12')
+        self.assertEqual(self.value_of(*lines, 'a(2) + b(2) + a(3)'), '19')
+
+    def test_rebound_parameter(self):
+        self.assertEqual(self.value_of('fun g(n): (let n = n + 1) * 2', 'g(1)'), '4')
+
+    def test_locals_do_not_leak_between_calls(self):
+        # call contexts are pooled, a reused one must not keep the last call's variables
+        lines = ('fun setw(x): let w = x', 'fun getw(): w', 'setw(5)')
+        self.assertEqual(self.error_of(*lines, 'getw()')[0], "'w' not defined")
+        self.assertEqual(self.error_of(*lines, 'w')[0], "'w' not defined")
+
+    def test_context_pool(self):
+        module = Context('<module>', symbol_map=interpreter.GLOBAL_SYMBOL_MAP)
+        vm = Interpreter()
+        vm.execute(compiled('fun down(n): if n == 0 then 0 else down(n - 1)'), module)
+        vm.execute(compiled('fun add(a, b): a + b'), module)
+
+        self.assertEqual(vm.execute(compiled('down(1000)'), module), (0, None))
+        # returned contexts are kept for reuse, up to a limit
+        self.assertEqual(len(vm.context_pool), interpreter.CONTEXT_POOL_SIZE)
+        self.assertEqual(Interpreter().context_pool, [])
+
+        # a call takes a pooled context and gives it back
+        pooled = vm.context_pool[-1]
+        self.assertEqual(vm.execute(compiled('add(1, 2)'), module), (3, None))
+        self.assertIs(vm.context_pool[-1], pooled)
+        self.assertEqual(len(vm.context_pool), interpreter.CONTEXT_POOL_SIZE)
+
+        # a call with the wrong argument count doesn't take one
+        value, error = vm.execute(compiled('add(1)'), module)
+        self.assertEqual(error.info, 'Not enough arguments given into add, takes 2')
+        self.assertEqual(len(vm.context_pool), interpreter.CONTEXT_POOL_SIZE)
+
+    def test_recursion(self):
+        fib = 'fun fib(n): if n < 2 then n else fib(n - 1) + fib(n - 2)'
+        self.assertEqual(self.value_of(fib, 'fib(15)'), '610')
+
+    def test_deep_recursion(self):
+        down = 'fun down(n): if n == 0 then 0 else down(n - 1)'
+        self.assertEqual(self.value_of(down, 'down(20000)'), '0')
+
+    def test_error_in_recursion(self):
+        bad = 'fun bad(n): if n == 0 then 1 + true else bad(n - 1)'
+        self.assertEqual(self.error_of(bad, 'bad(3)'),
+                         ('Number does not support + operator with Bool', '~~~~~~',
+                          ['File <test>, line 1, in <module>.', 'File <test>, line 1, in bad.']))
+        # the interpreter is still usable afterwards
+        self.assertEqual(self.value_of(bad, 'bad'), '<Function bad>')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Tests for constant folding, run with `python test_optimizer.py` from src
+"""
+import unittest
+
+import ast_parser
+import interpreter
+from interpreter import run
+from tokenizer import tokenize
+from ast_parser import make_ast
+from optimizer import fold_constants
+
+
+def folded(text):
+    """AST for text after constant folding"""
+    tokens, error = tokenize('<test>', text)
+    node, error = make_ast(tokens)
+    return fold_constants(node)
+
+
+class TestFoldBinop(unittest.TestCase):
+    def setUp(self):
+        interpreter.GLOBAL_SYMBOL_MAP.symbol_map.clear()
+
+    def assertFolded(self, text, value):
+        node = folded(text)
+        self.assertNotIsInstance(node, ast_parser.BinOpNode)
+        self.assertEqual(node.tok.value, value)
+
+    def assertNotFolded(self, text):
+        self.assertIsInstance(folded(text), ast_parser.BinOpNode)
+
+    def test_folds_numbers(self):
+        self.assertFolded('1 + 2 * 3', 7)
+        self.assertFolded('2 ^ 10', 1024)
+        self.assertFolded('1 < 2', 'true')
+        self.assertFolded('0.5 or 2', 'false')
+
+    def test_division_by_zero_is_left_to_runtime(self):
+        self.assertNotFolded('1 / 0')
+        self.assertNotFolded('1 / (2 - 2)')
+
+        value, error = run('<test>', '1 / 0')
+        self.assertIsNone(value)
+        self.assertEqual(error.info, 'Division by Zero')
+
+    def test_large_powers_are_left_to_runtime(self):
+        self.assertNotFolded('2 ^ 1000')
+        self.assertNotFolded('(2 ^ 64) ^ 2')
+
+        value, error = run('<test>', '2 ^ 1000')
+        self.assertEqual(value.value, 2 ** 1000)
+
+    def test_python_errors_are_left_to_runtime(self):
+        self.assertNotFolded('0 ^ -1')
+
+    def test_complex_results_match_runtime(self):
+        self.assertFolded('(0-1) ^ 0.5', (-1) ** 0.5)
+
+        folded_value, error = run('<test>', '(0-1) ^ 0.5')
+        self.assertIsNone(error)
+
+        run('<test>', 'let a = 0 - 1')
+        value, error = run('<test>', 'a ^ 0.5')
+        self.assertIsNone(error)
+        self.assertEqual(repr(folded_value), repr(value))
+
+    def test_bool_operands_keep_their_errors(self):
+        self.assertNotFolded('1 < 2 < 3')
+        self.assertNotFolded('true + 1')
+
+        value, error = run('<test>', '1 < 2 < 3')
+        self.assertIsNone(value)
+        self.assertEqual(error.info, 'Bool does not support < operator with Number')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+Tests for the lexer, run with `python test_tokenizer.py` from src
+"""
+import unittest
+
+import interpreter
+from interpreter import run
+from tokenizer import tokenize
+from token_kinds import INT, IDENTIFIER, KW, EQ, PLUS, NEWLINE, EOF
+
+
+def lexed(text):
+    """(type, value) of each token of text"""
+    tokens, error = tokenize('<test>', text)
+    assert error is None, repr(error)
+    return [(tok.type_, tok.value) for tok in tokens]
+
+
+class TestNonASCII(unittest.TestCase):
+    # characters past ASCII skip the lookup table and go through char_category
+
+    def setUp(self):
+        interpreter.GLOBAL_SYMBOL_MAP.symbol_map.clear()
+
+    def test_identifiers(self):
+        self.assertEqual(lexed('let é = 3'),
+                         [(KW, 'let'), (IDENTIFIER, 'é'), (EQ, None), (INT, 3), (EOF, None)])
+        self.assertEqual(lexed('naïve 名前'),
+                         [(IDENTIFIER, 'naïve'), (IDENTIFIER, '名前'), (EOF, None)])
+
+        run('<test>', 'let é = 3')
+        value, error = run('<test>', 'é + 1')
+        self.assertIsNone(error)
+        self.assertEqual(value.value, 4)
+
+    def test_whitespace(self):
+        # no-break space, ideographic space, line separator
+        self.assertEqual(lexed('1\u00a0+\u30002\u2028'), [(INT, 1), (PLUS, None), (INT, 2), (EOF, None)])
+        self.assertEqual(lexed('1\n2'), [(INT, 1), (NEWLINE, None), (INT, 2), (EOF, None)])
+
+    def test_digits(self):
+        self.assertEqual(lexed('١٢'), [(INT, 12), (EOF, None)])
+
+    def test_invalid_characters(self):
+        tokens, error = tokenize('<test>', '1 € 2')
+        self.assertEqual(error.info, "Character '€' is invalid.")
+        tokens, error = tokenize('<test>', '1 $ 2')
+        self.assertEqual(error.info, "Character '$' is invalid.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Token types
+"""
+from typing import Dict, Final
+
+
+# one bit each, so that a group of them is tested with a single &
+INT: Final = 1 << 0
+FLOAT: Final = 1 << 1
+
+PLUS: Final = 1 << 2
+MINUS: Final = 1 << 3
+MUL: Final = 1 << 4
+DIV: Final = 1 << 5
+POW: Final = 1 << 6
+
+EE: Final = 1 << 7  # ==
+NE: Final = 1 << 8
+LT: Final = 1 << 9
+GT: Final = 1 << 10
+LTE: Final = 1 << 11
+GTE: Final = 1 << 12
+
+EQ: Final = 1 << 13  # =
+
+L_PAREN: Final = 1 << 14
+R_PAREN: Final = 1 << 15
+
+LITERAL: Final = 1 << 16
+IDENTIFIER: Final = 1 << 17
+KW: Final = 1 << 18
+
+COLON: Final = 1 << 19
+COMMA: Final = 1 << 20
+NEWLINE: Final = 1 << 21
+EOF: Final = 1 << 22
+
+
+# token type -> its name, for printing tokens
+token_names: Final[Dict[int, str]] = {
+    INT: 'INT', FLOAT: 'FLOAT',
+    PLUS: 'PLUS', MINUS: 'MINUS', MUL: 'MUL', DIV: 'DIV', POW: 'POW',
+    EE: 'EE', NE: 'NE', LT: 'LT', GT: 'GT', LTE: 'LTE', GTE: 'GTE',
+    EQ: 'EQ',
+    L_PAREN: 'L_PAREN', R_PAREN: 'R_PAREN',
+    LITERAL: 'LITERAL', IDENTIFIER: 'IDENTIFIER', KW: 'KW',
+    COLON: 'COLON', COMMA: 'COMMA', NEWLINE: 'NEWLINE', EOF: 'EOF',
+}
@@ -1,25 +1,70 @@
-from tokens import t
-from tokens import Token
+import sys
+
+from token_kinds import (
+    INT, FLOAT, PLUS, MINUS, MUL, DIV, POW, EE, NE, LT, GT, LTE, GTE, EQ, L_PAREN,
+    R_PAREN, LITERAL, IDENTIFIER, KW, COLON, COMMA, NEWLINE, EOF,
+    token_names,
+)
+from tokens import Token, TokenStream
 
 from utils import Pos, InvalidCharacterError, InvalidSyntaxError
 
 
 car_tok_map = {
-    '+': t.PLUS,
-    '-': t.MINUS,
-    '*': t.MUL,
-    '/': t.DIV,
-    '^': t.POW,
-    '(': t.L_PAREN,
-    ')': t.R_PAREN,
-    ':': t.COLON,
-    ',': t.COMMA
+    '+': PLUS,
+    '-': MINUS,
+    '*': MUL,
+    '/': DIV,
+    '^': POW,
+    '(': L_PAREN,
+    ')': R_PAREN,
+    ':': COLON,
+    ',': COMMA
 }
 
-keywords = ('let', 'and', 'or', 'not', 'if', 'then', 'elif', 'else', 'fun')
+# keyword -> its interned string, stored as the token value so keyword checks compare by identity
+keywords = {kw: sys.intern(kw) for kw in ('let', 'and', 'or', 'not', 'if', 'then', 'elif', 'else', 'fun')}
 
 literals = ('true', 'false')
 
+# character categories for the lexer's main loop; a character that is a token
+# by itself, like '+' or a newline, has its token type as its category instead,
+# so these start above every token type
+DIGIT = max(token_names) << 1
+ALPHA = DIGIT + 1
+SPACE = DIGIT + 2
+BANG = DIGIT + 3
+EQUALS = DIGIT + 4
+LESS = DIGIT + 5
+GREATER = DIGIT + 6
+INVALID = DIGIT + 7
+
+
+def char_category(car):
+    if car.isnumeric():
+        return DIGIT
+    if car.isalpha():
+        return ALPHA
+    if car in car_tok_map:
+        return car_tok_map[car]
+    if car == '!':
+        return BANG
+    if car == '=':
+        return EQUALS
+    if car == '<':
+        return LESS
+    if car == '>':
+        return GREATER
+    if car == '\n':
+        return NEWLINE
+    if car.isspace():
+        return SPACE
+    return INVALID
+
+
+# ASCII code -> category, other characters are classified by char_category
+ascii_categories = tuple(char_category(chr(code)) for code in range(128))
+
 
 # Tokenizer/Lexer
 class Tokenizer:
@@ -28,55 +73,70 @@ class Tokenizer:
         self.text = text
         self.text_length = len(text)
         self.car = None
-        self.pos = Pos(file_name, text, -1, 0, -1)
+        # the position is kept as plain ints, Pos objects are only made for tokens and errors
+        self.index = -1
+        self.line_num = 0
+        self.char_num = -1
         self.advance()
     
+    @property
+    def pos(self) -> Pos:
+        return Pos(self.file_name, self.text, self.index, self.line_num, self.char_num)
+    
     def advance(self):
-        self.pos.advance(self.car == '\n')
-        if self.pos.index >= self.text_length:
+        if self.car == '\n':
+            self.char_num = 1
+            self.line_num += 1
+        else:
+            self.char_num += 1
+        self.index += 1
+        
+        if self.index >= self.text_length:
             self.car = None
             return
-        self.car = self.text[self.pos.index]
+        self.car = self.text[self.index]
 
     def parse(self) -> tuple:
         tokens = []
+        append = tokens.append  # bound once for the loop
         
         while self.car is not None:
-            if self.car.isnumeric():
-                tokens.append(self.get_number())
+            code = ord(self.car)
+            category = ascii_categories[code] if code < 128 else char_category(self.car)
+            
+            if category == SPACE:
+                pass
+            elif category < DIGIT:
+                append(Token.punct(category, self.pos))
+            elif category == DIGIT:
+                append(self.get_number())
                 continue
-            if self.car.isalpha():
-                tokens.append(self.get_identifier())
+            elif category == ALPHA:
+                append(self.get_identifier())
                 continue
-            elif self.car in car_tok_map:
-                tokens.append(Token(car_tok_map[self.car], pos_start=self.pos))
-            elif self.car == '!':
+            elif category == BANG:
                 token, error = self.get_not_equals()
                 if error:
-                    return [], error
-                tokens.append(token)
-            elif self.car == '=':
-                tokens.append(self.get_equals())
-            elif self.car == '<':
-                tokens.append(self.get_less_then())
-            elif self.car == '>':
-                tokens.append(self.get_greater_then())
-            elif self.car.isspace():
-                if self.car == '\n':
-                    tokens.append(Token(t.NEWLINE, pos_start=self.pos))
-                pass
+                    return TokenStream(), error
+                append(token)
+            elif category == EQUALS:
+                append(self.get_equals())
+            elif category == LESS:
+                append(self.get_less_then())
+            elif category == GREATER:
+                append(self.get_greater_then())
             else:
-                return [], \
+                return TokenStream(), \
                        InvalidCharacterError(self.pos, f'Character {repr(self.car)} is invalid.')
             self.advance()
         
-        tokens.append(Token(t.EOF, pos_start=self.pos))
-        return tokens, None
+        append(Token.punct(EOF, self.pos))
+        return TokenStream(tokens), None
     
     def get_number(self):
         num_str = ''
         dot_count = 0
-        pos_start = self.pos.copy()
+        pos_start = self.pos
     
         while self.car is not None and (self.car.isnumeric() or self.car == '.'):
             if self.car == '.':
@@ -88,70 +148,73 @@ class Tokenizer:
             self.advance()
     
         if dot_count == 0:
-            return Token(t.INT, int(num_str), pos_start=pos_start, pos_end=self.pos.copy())
+            return Token(INT, int(num_str), pos_start, self.pos)
         else:
-            return Token(t.FLOAT, float(num_str), pos_start=pos_start, pos_end=self.pos.copy())
+            return Token(FLOAT, float(num_str), pos_start, self.pos)
 
     def get_not_equals(self):
-        start_pos = self.pos.copy()
+        start_pos = self.pos
         self.advance()
     
         if self.car == '=':
             self.advance()
-            return Token(t.NE, pos_start=start_pos, pos_end=self.pos.copy()), None
+            return Token(NE, None, start_pos, self.pos), None
     
         self.advance()
-        return None, InvalidSyntaxError(start_pos, self.pos.copy(), 'Invalid Syntax')
+        return None, InvalidSyntaxError(start_pos, self.pos, 'Invalid Syntax')
 
     def get_equals(self):
-        tok_type = t.EQ
-        start_pos = self.pos.copy()
+        tok_type = EQ
+        start_pos = self.pos
         self.advance()
         
         if self.car == '=':
-            tok_type = t.EE
+            tok_type = EE
             self.advance()
         
-        return Token(tok_type, pos_start=start_pos, pos_end=self.pos.copy())
+        return Token(tok_type, None, start_pos, self.pos)
     
     def get_less_then(self):
-        pos_start = self.pos.copy()
-        tok_type = t.LT
+        pos_start = self.pos
+        tok_type = LT
         self.advance()
         
         if self.car == '=':
-            tok_type = t.LTE
+            tok_type = LTE
             self.advance()
         
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos.copy())
+        return Token(tok_type, None, pos_start, self.pos)
     
     def get_greater_then(self):
-        pos_start = self.pos.copy()
-        tok_type = t.GT
+        pos_start = self.pos
+        tok_type = GT
         self.advance()
 
         if self.car == '=':
-            tok_type = t.GTE
+            tok_type = GTE
             self.advance()
 
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos.copy())
+        return Token(tok_type, None, pos_start, self.pos)
 
     def get_identifier(self):
-        iden: str = ''
-        pos_start = self.pos.copy()
+        pos_start = self.pos
+        start = self.index
         
         while self.car is not None and (self.car.isalnum() or self.car == '_'):
-            iden += self.car
             self.advance()
         
-        if iden in keywords:
-            toke_type = t.KW
-        elif iden in literals:
-            toke_type = t.LITERAL
+        iden: str = self.text[start:self.index]
+        
+        keyword = keywords.get(iden)
+        if keyword is not None:
+            toke_type = KW
+            iden = keyword
         else:
-            toke_type = t.IDENTIFIER
+            toke_type = LITERAL if iden in literals else IDENTIFIER
+            # every use of a name shares one string, symbol map lookups then hit on identity
+            iden = sys.intern(iden)
         
-        return Token(toke_type, iden, pos_start, self.pos.copy())
+        return Token(toke_type, iden, pos_start, self.pos)
 
 
 def tokenize(file_name, text: str):
@@ -1,53 +1,106 @@
+# mypy: disallow-untyped-defs
+from typing import Iterable, Iterator, List, Optional
+
+from utils import Pos
+
+import token_kinds
+from token_kinds import token_names
+
+
 class t:
-    INT = 'INT'
-    FLOAT = 'FLOAT'
+    """The token types as a namespace, kept for code written against it; see token_kinds"""
+    INT = token_kinds.INT
+    FLOAT = token_kinds.FLOAT
+    PLUS = token_kinds.PLUS
+    MINUS = token_kinds.MINUS
+    MUL = token_kinds.MUL
+    DIV = token_kinds.DIV
+    POW = token_kinds.POW
+    EE = token_kinds.EE
+    NE = token_kinds.NE
+    LT = token_kinds.LT
+    GT = token_kinds.GT
+    LTE = token_kinds.LTE
+    GTE = token_kinds.GTE
+    EQ = token_kinds.EQ
+    L_PAREN = token_kinds.L_PAREN
+    R_PAREN = token_kinds.R_PAREN
+    LITERAL = token_kinds.LITERAL
+    IDENTIFIER = token_kinds.IDENTIFIER
+    KW = token_kinds.KW
+    COLON = token_kinds.COLON
+    COMMA = token_kinds.COMMA
+    NEWLINE = token_kinds.NEWLINE
+    EOF = token_kinds.EOF
+
+
+class Token:
+    __slots__ = ('type_', 'value', 'pos_start', 'pos_end')
     
-    PLUS = 'PLUS'
-    MINUS = 'MINUS'
-    MUL = 'MUL'
-    DIV = 'DIV'
-    POW = 'POW'
+    type_: int
+    value: object
+    pos_start: Optional[Pos]
+    pos_end: Optional[Pos]
     
-    EE = 'EE'  # ==
-    NE = 'NE'
-    LT = 'LT'
-    GT = 'GT'
-    LTE = 'LTE'
-    GTE = 'GTE'
+    # positional-only, tokens are made on the lexer's hot path
+    def __init__(self, type_: int, value: object = None,
+                 pos_start: Optional[Pos] = None, pos_end: Optional[Pos] = None, /) -> None:
+        self.type_ = type_
+        self.value = value
+        
+        if pos_end is None and pos_start is not None:
+            # a token without an end position is one character long
+            pos_end = pos_start.advance()
+        self.pos_start = pos_start
+        self.pos_end = pos_end
     
-    EQ = 'EQ'  # =
+    @classmethod
+    def punct(cls, type_: int, pos: Pos) -> 'Token':
+        """Value-less token one character long at `pos`, skips __init__'s branching"""
+        tok = object.__new__(cls)
+        tok.type_ = type_
+        tok.value = None
+        tok.pos_start = pos
+        tok.pos_end = pos.advance()
+        return tok
     
-    L_PAREN = 'L_PAREN'
-    R_PAREN = 'R_PAREN'
+    def __repr__(self) -> str:
+        # value-less tokens, most of them, print as their type name alone
+        value = self.value
+        if value is None:
+            return token_names[self.type_]
+        return f'{token_names[self.type_]}:{value}'
     
-    LITERAL = 'LITERAL'
-    IDENTIFIER = 'IDENTIFIER'
-    KW = 'KW'
+    def is_type(self, *token_name_s: int) -> bool:
+        return self.type_ in token_name_s
     
-    COLON = 'COLON'
-    COMMA = 'COMMA'
-    NEWLINE = 'NEWLINE'
-    EOF = 'EOF'
+    def is_equals(self, token_name: int, value: object) -> bool:
+        # keyword values are interned by the tokenizer, so identity is enough
+        return self.type_ == token_name and self.value is value
 
 
-class Token:
-    def __init__(self, type_, value=None, pos_start=None, pos_end=None):
-        self.type_ = type_
-        self.value = value
-        
-        if pos_start:
-            self.pos_start = pos_start.copy()
-            self.pos_end = pos_start.copy()
-            self.pos_end.advance()
-        
-        if pos_end:
-            self.pos_end = pos_end.copy()
+class TokenStream:
+    """
+    Tokens with their types and values also laid out as parallel lists, so
+    the parser tests the current token by index and only fetches a Token
+    for nodes and errors
+    """
+    __slots__ = ('tokens', 'types', 'values')
     
-    def __repr__(self):
-        return self.type_ + ('' if self.value is None else ':' + str(self.value))
+    tokens: List[Token]
+    types: List[int]
+    values: List[object]
     
-    def is_type(self, *token_name_s):
-        return self.type_ in token_name_s
+    def __init__(self, tokens: Iterable[Token] = ()) -> None:
+        self.tokens = list(tokens)
+        self.types = [tok.type_ for tok in self.tokens]
+        self.values = [tok.value for tok in self.tokens]
+    
+    def __len__(self) -> int:
+        return len(self.tokens)
+    
+    def __iter__(self) -> Iterator[Token]:
+        return iter(self.tokens)
     
-    def is_equals(self, token_name, value):
-        return self.type_ == token_name and self.value == value
+    def __getitem__(self, index: int) -> Token:
+        return self.tokens[index]
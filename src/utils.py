@@ -4,6 +4,9 @@ Pos and Errors
 
 
 class Pos:
+    """Immutable, so tokens and errors can share one instead of copying it"""
+    __slots__ = ('index', 'file_name', 'file_text', 'line_num', 'char_num')
+    
     def __init__(self, file_name, file_text, index, line_num, character_num):
         self.index = index
         self.file_name = file_name
@@ -15,15 +18,10 @@ class Pos:
         return f"Pos(line {self.line_num}, char {self.char_num})"
     
     def advance(self, new_line=False):
+        """Pos of the next character"""
         if new_line:
-            self.char_num = 1
-            self.line_num += 1
-        else:
-            self.char_num += 1
-        self.index += 1
-    
-    def copy(self):
-        return Pos(self.file_name, self.file_text, self.index, self.line_num, self.char_num)
+            return Pos(self.file_name, self.file_text, self.index + 1, self.line_num + 1, 1)
+        return Pos(self.file_name, self.file_text, self.index + 1, self.line_num, self.char_num + 1)
 
 
 def pos_highlight(text: str, pos_start: Pos, pos_end: Pos):